@@ -0,0 +1,133 @@
+import threading
+
+
+class IdAllocator:
+    """Hands out free ONT IDs (per gpon port) and service-port indexes (per OLT) locally,
+    so commands with explicit IDs can be generated up front without reading IDs back from OLT.
+
+    Used IDs are read in bulk by sync(). IDs handed out are pending until committed or released,
+    so they are not given out again during resync even if not yet configured on OLT. Pending IDs
+    seen on OLT by sync() are committed.
+    """
+
+    def __init__(self, max_onuid: int = 127, max_service_port_id: int = 65535) -> None:
+        self.max_onuid = max_onuid
+        self.max_service_port_id = max_service_port_id
+        self._lock = threading.Lock()
+        self._used_onuids = {}
+        self._used_service_port_ids = set()
+        self._allocated_onuids = {}
+        self._allocated_service_port_ids = set()
+        self._next_service_port_id = 0
+
+    def load_onuids(self, used_onuids: dict, frames=None) -> None:
+        """Sets ONT IDs used on OLT.
+
+        :param used_onuids: dict {(frame, board, port): iterable of ONT IDs}
+        :param frames: frames which used_onuids were read from, ONT IDs of gpon ports in other frames
+            are kept. None means used_onuids cover whole OLT.
+        """
+        with self._lock:
+            if frames is None:
+                self._used_onuids = {}
+            else:
+                frames = {int(frame) for frame in frames}
+                self._used_onuids = {fbp: onuids for fbp, onuids in self._used_onuids.items()
+                                     if fbp[0] not in frames}
+            for fbp, onuids in used_onuids.items():
+                self._used_onuids[fbp] = set(onuids)
+            for fbp, onuids in self._allocated_onuids.items():
+                if frames is None or fbp[0] in frames:
+                    onuids -= self._used_onuids.get(fbp, set())
+                self._used_onuids.setdefault(fbp, set()).update(onuids)
+
+    def load_service_port_ids(self, used_service_port_ids) -> None:
+        """Sets service-port indexes used on OLT"""
+        with self._lock:
+            self._used_service_port_ids = set(used_service_port_ids)
+            self._allocated_service_port_ids -= self._used_service_port_ids
+            self._used_service_port_ids |= self._allocated_service_port_ids
+            self._next_service_port_id = 0
+
+    def load(self, used_onuids: dict, used_service_port_ids) -> None:
+        """Sets all IDs used on OLT, see load_onuids and load_service_port_ids"""
+        self.load_onuids(used_onuids)
+        self.load_service_port_ids(used_service_port_ids)
+
+    def sync_onuids(self, olt, frame: int = 0) -> None:
+        """Reads ONT IDs used in given frame from OLT with one bulk query"""
+        onu_list = olt.get_onu_list(frame=frame)
+        if onu_list is None:
+            raise ValueError(f'Cannot read ONU list from {olt}')
+        used_onuids = {}
+        for params in onu_list.values():
+            used_onuids.setdefault((params['frame'], params['board'], params['port']), set()).add(params['onuid'])
+        self.load_onuids(used_onuids, frames=[frame])
+
+    def sync_service_port_ids(self, olt) -> None:
+        """Reads service-port indexes used on OLT with one bulk query"""
+        self.load_service_port_ids(olt.get_service_port_ids())
+
+    def sync(self, olt, frame: int = 0) -> None:
+        """Reads used ONT IDs (of given frame) and service-port indexes from OLT with one bulk query each"""
+        self.sync_onuids(olt, frame)
+        self.sync_service_port_ids(olt)
+
+    def allocate_onuids(self, frame: int, board: int, port: int, count: int) -> list:
+        fbp = (int(frame), int(board), int(port))
+        with self._lock:
+            used = self._used_onuids.setdefault(fbp, set())
+            free = [onuid for onuid in range(self.max_onuid + 1) if onuid not in used][:count]
+            if len(free) < count:
+                raise ValueError(f'Not enough free ONT IDs on port {frame}/{board}/{port}')
+            used.update(free)
+            self._allocated_onuids.setdefault(fbp, set()).update(free)
+            return free
+
+    def allocate_onuid(self, frame: int, board: int, port: int) -> int:
+        return self.allocate_onuids(frame, board, port, 1)[0]
+
+    def commit_onuid(self, frame: int, board: int, port: int, onuid: int) -> None:
+        """Marks ONT ID as configured on OLT, so it can be given out again after it is deleted and resynced"""
+        fbp = (int(frame), int(board), int(port))
+        with self._lock:
+            self._allocated_onuids.get(fbp, set()).discard(int(onuid))
+
+    def release_onuid(self, frame: int, board: int, port: int, onuid: int) -> None:
+        """Gives back ONT ID which was not configured (or was deleted) on OLT"""
+        fbp = (int(frame), int(board), int(port))
+        with self._lock:
+            self._used_onuids.get(fbp, set()).discard(int(onuid))
+            self._allocated_onuids.get(fbp, set()).discard(int(onuid))
+
+    def allocate_service_port_ids(self, count: int) -> list:
+        with self._lock:
+            free = []
+            sp_id = self._next_service_port_id
+            for _ in range(self.max_service_port_id + 1):
+                if len(free) == count:
+                    break
+                if sp_id not in self._used_service_port_ids:
+                    free.append(sp_id)
+                sp_id = (sp_id + 1) % (self.max_service_port_id + 1)
+            if len(free) < count:
+                raise ValueError('Not enough free service-port indexes')
+            self._next_service_port_id = sp_id
+            self._used_service_port_ids.update(free)
+            self._allocated_service_port_ids.update(free)
+            return free
+
+    def allocate_service_port_id(self) -> int:
+        return self.allocate_service_port_ids(1)[0]
+
+    def commit_service_port_id(self, service_port_id: int) -> None:
+        """Marks service-port index as configured on OLT, so it can be given out again
+        after it is deleted and resynced"""
+        with self._lock:
+            self._allocated_service_port_ids.discard(int(service_port_id))
+
+    def release_service_port_id(self, service_port_id: int) -> None:
+        """Gives back service-port index which was not configured (or was deleted) on OLT"""
+        with self._lock:
+            self._used_service_port_ids.discard(int(service_port_id))
+            self._allocated_service_port_ids.discard(int(service_port_id))
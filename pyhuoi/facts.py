@@ -0,0 +1,112 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+UPTIME_UNITS = {'day': 86400, 'hour': 3600, 'minute': 60, 'second': 1}
+
+
+def uptime_to_seconds(uptime: str) -> int:
+    """Converts uptime string from `display version` (like '12 day(s), 3 hour(s), 4 minute(s), 5 second(s)')
+    into seconds."""
+    return sum(int(value) * UPTIME_UNITS[unit]
+               for value, unit in re.findall(r'([0-9]+)\s*(day|hour|minute|second)', uptime))
+
+
+class DeviceFactsCache:
+    """Disk backed cache of static OLT facts (version, board layout, gpon ports), shared by jobs
+    using the same directory. Facts of every OLT are kept in separate file, read on every access.
+
+    Facts of an OLT are kept together with its boot time (derived from uptime) and reused only while
+    the cache entry is younger than max_age and the clock did not go backwards. Every fresh version
+    read is compared with the cached one - reboot or changed version drops all facts of that OLT.
+    Cache does not query OLT itself, so reboot is not noticed before max_age expires
+    unless version is read again.
+    """
+
+    def __init__(self, directory: str, max_age: float = 3600, tolerance: float = 120) -> None:
+        """
+        :param directory: directory to keep facts in, one json file per OLT
+        :param max_age: seconds after which cached facts are not trusted anymore, None means no limit
+        :param tolerance: allowed boot time difference in seconds (uptime has second resolution
+            and is read some time after command was sent)
+        """
+        self.directory = directory
+        self.max_age = max_age
+        self.tolerance = tolerance
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, ip: str) -> str:
+        return os.path.join(self.directory, re.sub(r'[^A-Za-z0-9.-]', '_', ip) + '.json')
+
+    def _load(self, ip: str):
+        """Returns entry of OLT read from disk, or None if there is none or it cannot be read"""
+        try:
+            with open(self._path(ip), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or not {'facts', 'boot_time', 'fetched_at'} <= entry.keys():
+            return None
+        return entry
+
+    def _save(self, ip: str, entry: dict) -> None:
+        """Writes entry of OLT atomically, so other jobs never read partially written file"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(ip))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _valid_entry(self, ip: str):
+        entry = self._load(ip)
+        if entry is None:
+            return None
+        age = time.time() - entry['fetched_at']
+        if age < 0 or (self.max_age is not None and age > self.max_age):
+            return None
+        return entry
+
+    def get(self, ip: str, key: str):
+        """Returns cached fact or None if not cached or cache entry is not valid anymore"""
+        with self._lock:
+            if entry := self._valid_entry(ip):
+                return entry['facts'].get(key)
+            return None
+
+    def set(self, ip: str, key: str, value) -> None:
+        """Stores fact of OLT which version was already cached, otherwise does nothing.
+        Facts without known boot time could not be invalidated after reboot."""
+        with self._lock:
+            if entry := self._valid_entry(ip):
+                entry['facts'][key] = value
+                self._save(ip, entry)
+
+    def update_version(self, ip: str, version: dict) -> None:
+        """Stores freshly read version dict. Drops other facts when OLT was rebooted
+        or its version changed since they were cached."""
+        now = time.time()
+        boot_time = now - uptime_to_seconds(version['uptime'])
+        static_version = {key: value for key, value in version.items() if key != 'uptime'}
+        with self._lock:
+            entry = self._load(ip)
+            if entry is None or abs(entry['boot_time'] - boot_time) > self.tolerance \
+                    or entry['facts'].get('version') != static_version:
+                entry = {'facts': {}}
+            entry['boot_time'] = boot_time
+            entry['fetched_at'] = now
+            entry['facts']['version'] = static_version
+            self._save(ip, entry)
+
+    def invalidate(self, ip: str) -> None:
+        with self._lock:
+            try:
+                os.unlink(self._path(ip))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,155 @@
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# commands dumping whole tables, expensive for OLT management CPU
+HEAVY_COMMAND_PATTERNS = (r'^display ont info .*\ball$',
+                          r'^display service-port (all|port \S+)$',
+                          r'^display current-configuration')
+
+
+class CommandGovernor:
+    """Limits commands sent to one OLT, shared by all sessions to this OLT.
+
+    Commands are let through by token bucket (rate per second, burst) and at most max_heavy
+    heavy commands run at once. Latency is normalised by output size (seconds per KB, with first KB
+    for free, so e.g. shards of `display ont info` of different size are comparable) and compared per
+    command kind (like 'display ont info' or 'ont add') with its baseline - best average seen, slowly
+    drifting up to current average. When average grows above latency_factor times the baseline, rate is
+    halved (at most once per cooldown seconds, not below min_rate), otherwise it slowly grows back
+    to the configured rate.
+    """
+    _governors = {}
+    _governors_lock = threading.Lock()
+
+    def __init__(self, rate: float = 10.0, burst: int = 10, max_heavy: int = 1, latency_factor: float = 3.0,
+                 min_rate: float = 0.5, cooldown: float = 5.0, heavy_patterns=HEAVY_COMMAND_PATTERNS,
+                 rate_window: float = 10.0) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_heavy = max_heavy
+        self.latency_factor = latency_factor
+        self.min_rate = min_rate
+        self.cooldown = cooldown
+        self.rate_window = rate_window
+        self.heavy_patterns = [re.compile(pattern) for pattern in heavy_patterns]
+        self.current_rate = rate
+        self._lock = threading.Lock()
+        self._heavy_semaphore = threading.BoundedSemaphore(max_heavy)
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._backoff_at = 0.0
+        # average latency per command class (heavy or not), for metrics
+        self._latency = {}
+        # average and baseline latency per KB of output, per command kind
+        self._kind_latency = {}
+        self._baseline_latency = {}
+        self._queue_delay = 0.0
+        self._last_queue_delay = 0.0
+        self._waiting = 0
+        self._heavy_running = 0
+        self._commands = 0
+        # finish times of commands in last rate_window seconds
+        self._finished_at = deque()
+
+    @classmethod
+    def for_olt(cls, ip: str) -> 'CommandGovernor':
+        """Returns governor shared by all Olt objects with given ip"""
+        with cls._governors_lock:
+            if ip not in cls._governors:
+                cls._governors[ip] = cls()
+            return cls._governors[ip]
+
+    def is_heavy(self, cmd: str) -> bool:
+        return any(pattern.search(cmd.strip()) for pattern in self.heavy_patterns)
+
+    @staticmethod
+    def command_kind(cmd: str) -> str:
+        """Returns leading words of command, up to first parameter with digit (at most 3 words)"""
+        words = []
+        for word in cmd.split()[:3]:
+            if re.search('[0-9]', word):
+                break
+            words.append(word)
+        return ' '.join(words)
+
+    def _take_token(self) -> float:
+        """Takes token from bucket (going into debt if empty), returns seconds to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.current_rate)
+            self._refilled_at = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.current_rate
+
+    def _record(self, cmd: str, heavy: bool, queue_delay: float, latency: float, output_size: int) -> None:
+        kind = self.command_kind(cmd)
+        normalised = latency / (1 + output_size / 1024)
+        with self._lock:
+            self._commands += 1
+            now = time.monotonic()
+            self._finished_at.append(now)
+            while self._finished_at[0] < now - self.rate_window:
+                self._finished_at.popleft()
+            self._last_queue_delay = queue_delay
+            self._queue_delay = 0.8 * self._queue_delay + 0.2 * queue_delay
+            self._latency[heavy] = 0.8 * self._latency.get(heavy, latency) + 0.2 * latency
+            average = self._kind_latency[kind] = 0.8 * self._kind_latency.get(kind, normalised) + 0.2 * normalised
+            baseline = self._baseline_latency.get(kind, average)
+            # baseline drifts up, so it recovers when latency of command kind changes for good
+            baseline = self._baseline_latency[kind] = min(average, baseline + 0.01 * (average - baseline))
+            if average > baseline * self.latency_factor:
+                if now - self._backoff_at > self.cooldown:
+                    self.current_rate = max(self.min_rate, self.current_rate / 2)
+                    self._backoff_at = now
+            else:
+                self.current_rate = min(self.rate, self.current_rate + self.rate / 20)
+
+    @contextmanager
+    def command(self, cmd: str):
+        """Context manager to wrap sending of command with. Yields dict, in which
+        'output_size' (length of command output) should be set after command is sent."""
+        heavy = self.is_heavy(cmd)
+        queued_at = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+        try:
+            if wait := self._take_token():
+                time.sleep(wait)
+            if heavy:
+                self._heavy_semaphore.acquire()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        started_at = time.monotonic()
+        stats = {'output_size': 0}
+        try:
+            if heavy:
+                with self._lock:
+                    self._heavy_running += 1
+            yield stats
+        finally:
+            if heavy:
+                with self._lock:
+                    self._heavy_running -= 1
+                self._heavy_semaphore.release()
+            self._record(cmd, heavy, started_at - queued_at, time.monotonic() - started_at, stats['output_size'])
+
+    def metrics(self) -> dict:
+        """Returns configured rate, current rate limit, observed rate (commands per second
+        finished in last rate_window seconds), queueing delay and latency"""
+        with self._lock:
+            now = time.monotonic()
+            finished = sum(1 for finished_at in self._finished_at if finished_at >= now - self.rate_window)
+            return {'rate': self.rate,
+                    'current_rate': self.current_rate,
+                    'observed_rate': finished / self.rate_window,
+                    'commands': self._commands,
+                    'waiting': self._waiting,
+                    'heavy_running': self._heavy_running,
+                    'queue_delay': self._queue_delay,
+                    'last_queue_delay': self._last_queue_delay,
+                    'latency': self._latency.get(False),
+                    'heavy_latency': self._latency.get(True)}
@@ -2,6 +2,16 @@ from netmiko import ConnectHandler, ReadTimeout
 import re
 from enum import Enum
 from pyhuoi.onu import Onu, ServicePort, BtvUser
+from pyhuoi.facts import DeviceFactsCache
+from pyhuoi.allocator import IdAllocator
+from pyhuoi.governor import CommandGovernor
+
+
+# OLT refusing ONT ID / service-port index which is already in use
+ONUID_CONFLICT_PATTERN = r'ONT ?ID (has )?(already )?existed?'
+SERVICE_PORT_ID_CONFLICT_PATTERN = r'service virtual port (index )?(has )?(already )?existed?'
+# read timeout of commands which OLT may process for minutes, like undo service-port
+SLOW_COMMAND_TIMEOUT = 300
 
 
 class OltConfigMode(Enum):
@@ -19,12 +29,20 @@ class Olt:
     username: str = None
     password: str = None
     interface_mode_interface: str = None
+    facts_cache: DeviceFactsCache = None
+    governor: CommandGovernor = None
 
-    def __init__(self, ip: str = '', username: str = '', password: str = '', session_log: str = None) -> None:
+    def __init__(self, ip: str = '', username: str = '', password: str = '', session_log: str = None,
+                 facts_cache: DeviceFactsCache = None, governor: CommandGovernor = None) -> None:
+        """
+        :param governor: limits commands sent to OLT, by default governor shared by all Olt objects with same ip
+        """
         self.ip = ip
         self.username = username
         self.password = password
         self.session_log = session_log
+        self.facts_cache = facts_cache
+        self.governor = governor or CommandGovernor.for_olt(ip)
 
     def __repr__(self):
         return f'OLT ip {self.ip}'
@@ -42,7 +60,27 @@ class Olt:
             self._init_connection()
         return self.connection
 
-    def get_version(self) -> dict:
+    def _send_command(self, cmd: str, **kwargs) -> str:
+        """Sends command through governor of this OLT"""
+        conn = self.get_connection()
+        with self.governor.command(cmd) as stats:
+            output = conn.send_command(cmd, **kwargs)
+            stats['output_size'] = len(output)
+            return output
+
+    def get_governor_metrics(self) -> dict:
+        return self.governor.metrics()
+
+    def get_version(self, cached: bool = False) -> dict:
+        """Returns parsed `display version`.
+
+        :param cached: if True and version is in facts_cache, returns it without querying OLT.
+            Cached version has no 'uptime' key, as uptime is known only from OLT.
+        """
+        if cached and self.facts_cache:
+            if (version_dict := self.facts_cache.get(self.ip, 'version')) is not None:
+                return dict(version_dict)
+
         cmd = 'display version'
         valid_modes = (OltConfigMode.USER,
                        OltConfigMode.ENABLE,
@@ -51,28 +89,75 @@ class Olt:
             self.set_config_mode(OltConfigMode.CONFIG)
         version_pattern = r'\s+([A-Za-z ]+[A-Za-z]+?)\s+:\s+([A-Za-z0-9 -]+?)\s*$'
         uptime_pattern = r'Uptime is\s([^\n]+)'
-        conn = self.get_connection()
-        output = conn.send_command(cmd)
+        output = self._send_command(cmd)
         version_dict = {}
         for section in re.findall(version_pattern, output, re.MULTILINE):
             version_dict[section[0].lower().strip()] = section[1]
         uptime = re.findall(uptime_pattern, output).pop()
         version_dict['uptime'] = uptime
+        if self.facts_cache:
+            self.facts_cache.update_version(self.ip, version_dict)
         return version_dict
 
+    def _get_cached_fact(self, key: str):
+        """Returns fact from facts_cache. Version is read from OLT first if not cached, so boot time
+        of OLT is known when fact is stored. OLT reboot is noticed only when cache max_age expires
+        or when get_version() reads OLT again - until then facts are reused without querying OLT."""
+        if not self.facts_cache:
+            return None
+        if self.facts_cache.get(self.ip, 'version') is None:
+            self.get_version()
+        return self.facts_cache.get(self.ip, key)
+
+    def get_board(self, frame: int = 0) -> dict:
+        """Returns boards layout of given frame from `display board`, as dict
+        {slot: {'name': board name, 'status': board status}}. Empty slots are skipped."""
+        key = f'board {frame}'
+        if (board_dict := self._get_cached_fact(key)) is not None:
+            return {int(slot): board for slot, board in board_dict.items()}
+
+        valid_modes = (OltConfigMode.USER,
+                       OltConfigMode.ENABLE,
+                       OltConfigMode.CONFIG)
+        if self.get_config_mode() not in valid_modes:
+            self.set_config_mode(OltConfigMode.CONFIG)
+        board_pattern = r'^\s*([0-9]+)\s+([A-Z][A-Z0-9]+)\s+(\S+)'
+        output = self._send_command(f'display board {frame}')
+        board_dict = {int(slot): {'name': name, 'status': status}
+                      for slot, name, status in re.findall(board_pattern, output, re.MULTILINE)}
+        if self.facts_cache:
+            self.facts_cache.set(self.ip, key, board_dict)
+        return board_dict
+
+    def get_gpon_ports(self, frame: int = 0) -> list:
+        """Returns list of (frame, board, port) of all GPON ports in given frame"""
+        key = f'gpon ports {frame}'
+        if (gpon_ports := self._get_cached_fact(key)) is not None:
+            return [tuple(fbp) for fbp in gpon_ports]
+
+        gpon_boards = [slot for slot, board in self.get_board(frame).items() if 'GP' in board['name']]
+        gpon_port_pattern = r'^\s*([0-9]+)\s+GPON\s'
+        gpon_ports = []
+        for slot in gpon_boards:
+            output = self._send_command(f'display board {frame}/{slot}')
+            gpon_ports += [(int(frame), slot, int(port))
+                           for port in re.findall(gpon_port_pattern, output, re.MULTILINE)]
+        if self.facts_cache:
+            self.facts_cache.set(self.ip, key, gpon_ports)
+        return gpon_ports
+
     def get_onu_list(self, frame: int = None, board: int = None, port: int = None):
         if port is not None and (frame is None or board is None) or \
                 board is not None and frame is None:
             raise ValueError('Please pass frame with board or/and port')
 
-        cmd = f'display ont info {frame or "0"} {board or ""} {port or ""} all'
+        cmd = f'display ont info {frame or "0"} {"" if board is None else board} {"" if port is None else port} all'
         cmd = re.sub(' +', ' ', cmd)
         # ont_info_list_pattern = r'([0-9]+)\/ ([0-9]+)\/([0-9]+)\s+([0-9]+)  ([A-F0-9]+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)'
         ont_info_list_pattern = r'([0-9]+)\/\s*([0-9]+)\/([0-9]+)\s+([0-9]+)  ([A-F0-9]+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)'
         self.set_config_mode(OltConfigMode.ENABLE)
-        conn = self.get_connection()
         try:
-            output = conn.send_command(cmd, read_timeout=90, expect_string="#")
+            output = self._send_command(cmd, read_timeout=90, expect_string="#")
         except Exception as e:
             print(f'Exception: {e} on \nolt: {self}')
             return None
@@ -83,6 +168,17 @@ class Olt:
                         'run': run, 'config': config, 'match': match, 'protect': protect}
                 for frame, board, port, onuid, onusn, control, run, config, match, protect in olt_list_match}
 
+    def get_onu_list_by_boards(self, frame: int = 0):
+        """Same as get_onu_list(frame), but queries every GPON board separately using (cached) board
+        layout. Shorter outputs of per board queries do not hit read timeout on big chassis."""
+        onu_list = {}
+        for board in sorted({board for _, board, _ in self.get_gpon_ports(frame)}):
+            board_onu_list = self.get_onu_list(frame=frame, board=board)
+            if board_onu_list is None:
+                return None
+            onu_list.update(board_onu_list)
+        return onu_list
+
     def get_config_mode(self) -> OltConfigMode:
         return self.config_mode
 
@@ -94,29 +190,31 @@ class Olt:
         if self.config_mode == mode:
             return None
 
-        conn = self.get_connection()
+        # mode is not known before connecting, connection starts in user mode
+        if self.config_mode is None:
+            self.get_connection()
         if self.config_mode == OltConfigMode.USER:
-            conn.send_command('enable', expect_string='#')
+            self._send_command('enable', expect_string='#')
             self.config_mode = OltConfigMode.ENABLE
             return self.set_config_mode(mode)
 
         if self.config_mode == OltConfigMode.ENABLE:
             if mode == OltConfigMode.USER:
-                conn.send_command('disable', expect_string='>')
+                self._send_command('disable', expect_string='>')
                 self.config_mode = OltConfigMode.USER
                 return
             if mode == OltConfigMode.CONFIG:
-                conn.send_command('config', expect_string=r'\(config\)#')
+                self._send_command('config', expect_string=r'\(config\)#')
                 self.config_mode = OltConfigMode.CONFIG
                 return
 
         if self.config_mode == OltConfigMode.CONFIG:
-            conn.send_command('quit', expect_string='#')
+            self._send_command('quit', expect_string='#')
             self.config_mode = OltConfigMode.ENABLE
             return self.set_config_mode(mode)
 
         if self.config_mode == OltConfigMode.INTERFACE:
-            conn.send_command('quit', expect_string=r'\(config\)#')
+            self._send_command('quit', expect_string=r'\(config\)#')
             self.config_mode = OltConfigMode.CONFIG
             return self.set_config_mode(mode)
 
@@ -126,7 +224,7 @@ class Olt:
 
         conn = self.get_connection()
         expected_prompt = rf'\(config-if-gpon-{frame}/{board}\)#'
-        conn.send_command(f'interface gpon {frame}/{board}', expect_string=expected_prompt)
+        self._send_command(f'interface gpon {frame}/{board}', expect_string=expected_prompt)
         self.config_mode = OltConfigMode.INTERFACE
         self.interface_mode_interface = (frame, board)
         return conn.find_prompt()
@@ -138,11 +236,8 @@ class Olt:
         if self.connection:
             self.connection.disconnect()
 
-    def onu_add(self, onu: Onu):
-        """Adds onu on given frame/board/port. Sets onuid of Onu object after successfully added.
-
-        :returns: Error message or None if run successfully
-        """
+    @staticmethod
+    def _check_onu_add(onu: Onu) -> None:
         if onu.frame is None or onu.board is None or onu.port is None:
             raise TypeError('frame, board, port attributes of Onu must be set')
         if onu.srvprofile_name is None and onu.srvprofile_id is None:
@@ -150,23 +245,42 @@ class Olt:
         if onu.lineprofile_name is None and onu.lineprofile_id is None:
             raise TypeError('Either onu.lineprofile_name or _id must be set.')
 
-        cmd = f'ont add {onu.port} sn-auth {onu.sn} omci desc "{onu.desc}" ont-lineprofile-name' \
+    def onu_add(self, onu: Onu):
+        """Adds onu on given frame/board/port. Sets onuid of Onu object after successfully added.
+        If onuid is already set, onu is added with this ONT ID.
+
+        :returns: Error message or None if run successfully
+        """
+        self._check_onu_add(onu)
+
+        onuid = '' if onu.onuid is None else f' {onu.onuid}'
+        cmd = f'ont add {onu.port}{onuid} sn-auth {onu.sn} omci desc "{onu.desc}" ont-lineprofile-name' \
               f' "{onu.lineprofile_name}" ont-srvprofile-name "{onu.srvprofile_name}"'
-        conn = self.get_connection()
         try:
             self.set_interface_mode(onu.frame, onu.board)
         except ReadTimeout:
             return "ReadTimeout while edit gpon interface. Maybe this interface does not exist?"
         try:
-            output = conn.send_command(cmd)
+            output = self._send_command(cmd)
         except ReadTimeout as e:
             return str(e)
         if 'Number of ONTs that can be added: 1, success: 1' in output:
             if find := re.findall('ONTID :([0-9]+)', output):
-                onu.onuid = find[0][0]
+                onu.onuid = int(find[0])
                 return None
         return output
 
+    @staticmethod
+    def _check_service_port_add(onu: Onu, service_port: ServicePort) -> None:
+        if onu.frame is None or onu.board is None or onu.port is None or onu.onuid is None:
+            raise TypeError('frame, board, port and onuid must be set')
+        if service_port.vlan is None or service_port.gemport is None:
+            raise TypeError('service-port vlan and gemport must be set')
+        if service_port.inbound_traffic_table_id is not None and service_port.inbound_traffic_table_name is not None:
+            raise TypeError('inbound traffic table id and name cant be set at the same time')
+        if service_port.outbound_traffic_table_id is not None and service_port.outbound_traffic_table_name is not None:
+            raise TypeError('outbound traffic table id and name cant be set at the same time')
+
     def service_port_add(self, onu: Onu, service_port: ServicePort):
         """service-port 28 vlan 1554 gpon 0/0/0 ont 3 gemport 1 multi-service user-vlan
 301 tag-transform translate-and-add inner-vlan 301 inner-priority 0"""
@@ -179,17 +293,11 @@ traffic-table index 20"""
         # must have gpon interface, and onu_id, vlan, gemport +
         # optionally user-vlan or/and inner-vlan
         # optionally traffic-table + in/out + name/id
-        if onu.frame is None or onu.board is None or onu.port is None or onu.onuid is None:
-            raise TypeError('frame, board, port and onuid must be set')
-        if service_port.vlan is None or service_port.gemport is None:
-            raise TypeError('service-port vlan and gemport must be set')
+        self._check_service_port_add(onu, service_port)
         if service_port.user_vlan is None:
             service_port.user_vlan = service_port.vlan
-        if service_port.inbound_traffic_table_id is not None and service_port.inbound_traffic_table_name is not None:
-            raise TypeError('inbound traffic table id and name cant be set at the same time')
-        if service_port.outbound_traffic_table_id is not None and service_port.outbound_traffic_table_name is not None:
-            raise TypeError('outbound traffic table id and name cant be set at the same time')
-        cmd = f'service-port vlan {service_port.vlan} gpon {onu.frame}/{onu.board}/{onu.port} ' \
+        sp_id = '' if service_port.id is None else f' {service_port.id}'
+        cmd = f'service-port{sp_id} vlan {service_port.vlan} gpon {onu.frame}/{onu.board}/{onu.port} ' \
               f'ont {onu.onuid} gemport {service_port.gemport} multi-service user-vlan {service_port.user_vlan}'
         if service_port.inner_vlan is None:
             cmd += f' tag-transform translate'
@@ -205,11 +313,66 @@ traffic-table index 20"""
             cmd += f' outbound traffic-table name {service_port.outbound_traffic_table_name}'
 
         self.set_config_mode(OltConfigMode.CONFIG)
-        conn = self.get_connection()
-        result = conn.send_command(cmd)
+        result = self._send_command(cmd)
         if 'Failure' in result:
             return result
 
+    def onu_add_allocated(self, onu: Onu, allocator: IdAllocator):
+        """Adds onu with ONT ID taken from allocator. On ID conflict allocator is resynced
+        with OLT and adding is retried once. ONT ID is committed to allocator if onu was added,
+        otherwise released.
+
+        :returns: Error message or None if run successfully
+        """
+        self._check_onu_add(onu)
+        for attempt in range(2):
+            onuid = allocator.allocate_onuid(onu.frame, onu.board, onu.port)
+            onu.onuid = onuid
+            try:
+                result = self.onu_add(onu)
+            except BaseException:
+                allocator.release_onuid(onu.frame, onu.board, onu.port, onuid)
+                onu.onuid = None
+                raise
+            if result is None:
+                allocator.commit_onuid(onu.frame, onu.board, onu.port, onuid)
+                return None
+            allocator.release_onuid(onu.frame, onu.board, onu.port, onuid)
+            onu.onuid = None
+            if not re.search(ONUID_CONFLICT_PATTERN, result, re.IGNORECASE) or attempt:
+                return result
+            allocator.sync_onuids(self, frame=onu.frame)
+
+    def service_port_add_allocated(self, onu: Onu, service_port: ServicePort, allocator: IdAllocator):
+        """Adds service-port with index taken from allocator. On index conflict allocator is resynced
+        with OLT and adding is retried once. Index is committed to allocator if service-port was added,
+        otherwise released.
+
+        :returns: Error message or None if run successfully
+        """
+        self._check_service_port_add(onu, service_port)
+        for attempt in range(2):
+            service_port.id = allocator.allocate_service_port_id()
+            try:
+                result = self.service_port_add(onu, service_port)
+            except BaseException:
+                allocator.release_service_port_id(service_port.id)
+                service_port.id = None
+                raise
+            if result is None:
+                allocator.commit_service_port_id(service_port.id)
+                return None
+            allocator.release_service_port_id(service_port.id)
+            service_port.id = None
+            if not re.search(SERVICE_PORT_ID_CONFLICT_PATTERN, result, re.IGNORECASE) or attempt:
+                return result
+            allocator.sync_service_port_ids(self)
+
+    def get_service_port_ids(self) -> set:
+        """Returns indexes of all service-ports configured on OLT"""
+        return {int(service_port.id)
+                for *_, service_port in self._display_service_ports('display service-port all', read_timeout=90)}
+
     def btv_user_add(self, btv_user: BtvUser):
         # go to btv config mode
         # (config)# btv
@@ -225,11 +388,13 @@ traffic-table index 20"""
         # (config-mvlan2099)# igmp multicast-vlan member service-port 59
         return
 
-    def get_service_ports(self, onu: Onu):
-        cmd = f'display service-port port {onu.frame}/{onu.board}/{onu.port} ont {onu.onuid}'
+    def _display_service_ports(self, cmd: str, read_timeout: float = 10.0) -> list:
+        """Runs display service-port command.
+
+        :returns: list of tuples (frame, board, port, onuid, ServicePort)
+        """
         self.set_config_mode(OltConfigMode.ENABLE)
-        conn = self.get_connection()
-        output = conn.send_command(cmd)
+        output = self._send_command(cmd, read_timeout=read_timeout)
         # id, vlan, vattrib, frame, board, port, onuid, gemport, user-vlan, traffix-rx-id, traffic-tx-id
         display_service_port_pattern = r'\s+([0-9]+)\s+([0-9]+)\s+(\S+)\s+gpon\s+([0-9]+)\/([0-9]+)\s+\/([0-9]+)\s+' \
                                        r'([0-9]+)\s+([0-9]+)\s+vlan\s+([0-9]+)\s+([-0-9]+)\s+([-0-9]+)\s+\S+'
@@ -242,15 +407,174 @@ traffic-table index 20"""
                                        user_vlan=sp[8],
                                        inbound_traffic_table_id=sp[9],
                                        outbound_traffic_table_id=sp[10])
-            service_port_list.append(service_port)
+            service_port_list.append((int(sp[3]), int(sp[4]), int(sp[5]), int(sp[6]), service_port))
         return service_port_list
 
+    def get_service_ports(self, onu: Onu):
+        cmd = f'display service-port port {onu.frame}/{onu.board}/{onu.port} ont {onu.onuid}'
+        return [service_port for *_, service_port in self._display_service_ports(cmd)]
+
+    def _send_command_confirm(self, cmd: str, read_timeout: float = 10.0) -> str:
+        """Sends command answering 'y' if OLT asks for confirmation"""
+        output = self._send_command(cmd, expect_string=r'\(y/n\)|#', read_timeout=read_timeout)
+        if '(y/n)' in output:
+            output += self._send_command('y', expect_string='#', read_timeout=read_timeout)
+        return output
+
+    def _resync_session(self) -> None:
+        """Sets config_mode from current prompt after command did not finish in time.
+        Drops connection if prompt cannot be read, so next command reconnects."""
+        try:
+            prompt = self.get_connection().find_prompt()
+        except Exception:
+            try:
+                self.disconnect()
+            except Exception:
+                pass
+            self.connection = None
+            self.config_mode = None
+            self.interface_mode_interface = None
+            return
+        self.interface_mode_interface = None
+        if find := re.search(r'\(config-if-gpon-([0-9]+)/([0-9]+)\)#', prompt):
+            self.config_mode = OltConfigMode.INTERFACE
+            self.interface_mode_interface = (find[1], find[2])
+        elif '(config-' in prompt:
+            # any other config sub mode, left with quit as interface mode
+            self.config_mode = OltConfigMode.INTERFACE
+        elif '(config)' in prompt:
+            self.config_mode = OltConfigMode.CONFIG
+        elif prompt.endswith('#'):
+            self.config_mode = OltConfigMode.ENABLE
+        else:
+            self.config_mode = OltConfigMode.USER
+
+    def service_port_delete(self, service_port_ids) -> dict:
+        """Deletes service-ports of given indexes in a single config mode visit.
+        Stops after command which did not finish in time, rest of service-ports is reported as not processed.
+
+        :returns: dict {service port id: error message or None if deleted successfully}
+        """
+        self.set_config_mode(OltConfigMode.CONFIG)
+        report = {}
+        timed_out = False
+        for sp_id in service_port_ids:
+            if timed_out:
+                report[sp_id] = 'Not processed, previous command did not finish in time'
+                continue
+            try:
+                output = self._send_command_confirm(f'undo service-port {sp_id}', read_timeout=SLOW_COMMAND_TIMEOUT)
+            except ReadTimeout as e:
+                report[sp_id] = str(e)
+                self._resync_session()
+                timed_out = True
+                continue
+            report[sp_id] = output if 'Failure' in output else None
+        return report
+
+    def onu_delete_bulk(self, onus) -> dict:
+        """Deletes ONUs together with their service-ports.
+
+        Service-ports of all gpon ports are resolved first, with one `display service-port port` query
+        per gpon port. Next they are removed per ONU with `undo service-port port F/S/P ont N` in a single
+        config mode visit, and ONUs are deleted with `ont delete` in a single visit of every gpon interface.
+        ONU which service-ports could not be resolved or removed is not deleted. After undo/delete command
+        which did not finish in time, rest of ONUs is not processed.
+
+        :returns: dict {(frame, board, port, onuid): error message or None if deleted successfully}
+        """
+        ports = {}
+        for onu in onus:
+            if onu.frame is None or onu.board is None or onu.port is None or onu.onuid is None:
+                raise TypeError('frame, board, port and onuid must be set')
+            ports.setdefault((int(onu.frame), int(onu.board), int(onu.port)), set()).add(int(onu.onuid))
+
+        report = {}
+        # {(frame, board, port, onuid): list of service port ids}
+        onu_service_ports = {}
+        for (frame, board, port), onuids in ports.items():
+            cmd = f'display service-port port {frame}/{board}/{port}'
+            try:
+                service_ports = self._display_service_ports(cmd, read_timeout=90)
+            except ReadTimeout as e:
+                for onuid in onuids:
+                    report[(frame, board, port, onuid)] = f'ReadTimeout while reading service-ports: {e}'
+                self._resync_session()
+                continue
+            for onuid in onuids:
+                report[(frame, board, port, onuid)] = None
+            for *_, onuid, service_port in service_ports:
+                if onuid in onuids:
+                    onu_service_ports.setdefault((frame, board, port, onuid), []).append(service_port.id)
+
+        not_processed = 'Not processed, previous command did not finish in time'
+        timed_out = False
+        if onu_service_ports:
+            self.set_config_mode(OltConfigMode.CONFIG)
+        for (frame, board, port, onuid), service_port_ids in sorted(onu_service_ports.items()):
+            if timed_out:
+                report[(frame, board, port, onuid)] = not_processed
+                continue
+            try:
+                output = self._send_command_confirm(f'undo service-port port {frame}/{board}/{port} ont {onuid}',
+                                                    read_timeout=SLOW_COMMAND_TIMEOUT)
+            except ReadTimeout as e:
+                output = f'Failure: {e}'
+                self._resync_session()
+                timed_out = True
+            if 'Failure' in output:
+                report[(frame, board, port, onuid)] = f'Service-ports {", ".join(service_port_ids)} ' \
+                                                      f'not removed: {output}'
+
+        interfaces = {}
+        for (frame, board, port, onuid), error in report.items():
+            if error is None:
+                interfaces.setdefault((frame, board), []).append((port, onuid))
+        for (frame, board), onts in interfaces.items():
+            if timed_out:
+                for port, onuid in onts:
+                    report[(frame, board, port, onuid)] = not_processed
+                continue
+            try:
+                self.set_interface_mode(frame, board)
+            except ReadTimeout:
+                for port, onuid in onts:
+                    report[(frame, board, port, onuid)] = "ReadTimeout while edit gpon interface."
+                self._resync_session()
+                continue
+            for port, onuid in onts:
+                if timed_out:
+                    report[(frame, board, port, onuid)] = not_processed
+                    continue
+                try:
+                    output = self._send_command_confirm(f'ont delete {port} {onuid}',
+                                                        read_timeout=SLOW_COMMAND_TIMEOUT)
+                except ReadTimeout as e:
+                    report[(frame, board, port, onuid)] = str(e)
+                    self._resync_session()
+                    timed_out = True
+                    continue
+                if 'success: 1' not in output:
+                    report[(frame, board, port, onuid)] = output
+        return report
+
+    def port_decommission(self, frame: int, board: int, port: int) -> dict:
+        """Deletes all ONUs (and their service-ports) from given gpon port.
+
+        :returns: report as from onu_delete_bulk or None if ONU list could not be read
+        """
+        onu_list = self.get_onu_list(frame=frame, board=board, port=port)
+        if onu_list is None:
+            return None
+        onus = [Onu(sn=sn, frame=params['frame'], board=params['board'], port=params['port'], onuid=params['onuid'])
+                for sn, params in onu_list.items()]
+        return self.onu_delete_bulk(onus)
+
     def get_onu_by_sn(self, sn: str) -> Onu:
         """query olt for onu parameters by given sn"""
-        conn = self.get_connection()
         self.set_config_mode(OltConfigMode.ENABLE)
         display_ont_info_pattern = r'F\/S\/P\s+:\s([0-9]+)\/([0-9]+)\/([0-9]+)\s+ONT-ID\s+:\s([0-9]+)'
-        output = conn.send_command(f'display ont info by-sn {sn}')
+        output = self._send_command(f'display ont info by-sn {sn}')
         if find := re.findall(display_ont_info_pattern, output):
             onu = Onu(frame=find[0][0],
                       board=find[0][1],
@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+from pyhuoi.allocator import IdAllocator
+import pytest
+
+
+def test_allocate_onuids():
+    allocator = IdAllocator(max_onuid=5)
+    allocator.load({(0, 1, 0): {0, 2}}, set())
+    assert allocator.allocate_onuids(0, 1, 0, 2) == [1, 3]
+    assert allocator.allocate_onuid('0', '1', '1') == 0
+    with pytest.raises(ValueError):
+        allocator.allocate_onuids(0, 1, 0, 3)
+    allocator.release_onuid(0, 1, 0, 1)
+    assert allocator.allocate_onuid(0, 1, 0) == 1
+
+
+def test_allocate_service_port_ids():
+    allocator = IdAllocator(max_service_port_id=7)
+    allocator.load({}, {0, 1, 3})
+    assert allocator.allocate_service_port_ids(3) == [2, 4, 5]
+    allocator.release_service_port_id(2)
+    assert allocator.allocate_service_port_ids(2) == [6, 7]
+    assert allocator.allocate_service_port_id() == 2
+    with pytest.raises(ValueError):
+        allocator.allocate_service_port_id()
+
+
+def test_allocated_ids_kept_after_load():
+    allocator = IdAllocator()
+    allocator.load({(0, 1, 0): {0}}, {0})
+    onuid = allocator.allocate_onuid(0, 1, 0)
+    sp_id = allocator.allocate_service_port_id()
+    allocator.load({(0, 1, 0): {0}}, {0})
+    assert allocator.allocate_onuid(0, 1, 0) != onuid
+    assert allocator.allocate_service_port_id() != sp_id
+
+
+def test_allocate_thread_safe():
+    allocator = IdAllocator(max_service_port_id=1023)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        ids = list(executor.map(lambda _: allocator.allocate_service_port_id(), range(1024)))
+    assert sorted(ids) == list(range(1024))
+
+
+def test_ids_reused_after_commit_and_resync():
+    allocator = IdAllocator()
+    allocator.load({(0, 1, 0): set()}, set())
+    onuid = allocator.allocate_onuid(0, 1, 0)
+    sp_id = allocator.allocate_service_port_id()
+    allocator.commit_onuid(0, 1, 0, onuid)
+    allocator.commit_service_port_id(sp_id)
+    # deleted from OLT before resync
+    allocator.load({(0, 1, 0): set()}, set())
+    assert allocator.allocate_onuid(0, 1, 0) == onuid
+    assert allocator.allocate_service_port_id() == sp_id
+
+
+def test_allocated_ids_committed_when_seen_on_olt():
+    allocator = IdAllocator()
+    allocator.load({(0, 1, 0): set()}, set())
+    onuid = allocator.allocate_onuid(0, 1, 0)
+    sp_id = allocator.allocate_service_port_id()
+    allocator.load({(0, 1, 0): {onuid}}, {sp_id})
+    allocator.load({(0, 1, 0): set()}, set())
+    assert allocator.allocate_onuid(0, 1, 0) == onuid
+    assert allocator.allocate_service_port_id() == sp_id
+
+
+def test_load_onuids_keeps_other_frames():
+    allocator = IdAllocator()
+    allocator.load({(0, 1, 0): {0}, (1, 1, 0): {0, 1}}, set())
+    allocator.load_onuids({(0, 1, 0): {0, 1}}, frames=[0])
+    assert allocator.allocate_onuid(1, 1, 0) == 2
+    assert allocator.allocate_onuid(0, 1, 0) == 2
+    allocator.load_onuids({}, frames=[1])
+    assert allocator.allocate_onuid(1, 1, 0) == 0
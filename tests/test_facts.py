@@ -0,0 +1,73 @@
+import time
+from pyhuoi.facts import DeviceFactsCache, uptime_to_seconds
+
+VERSION = {'version': 'MA5800V100R019C10', 'patch': 'SPC200', 'product': 'MA5800-X7',
+           'uptime': '12 day(s), 3 hour(s), 4 minute(s), 5 second(s)'}
+
+
+def test_uptime_to_seconds():
+    assert uptime_to_seconds(VERSION['uptime']) == 12 * 86400 + 3 * 3600 + 4 * 60 + 5
+    assert uptime_to_seconds('0 day(s), 0 hour(s), 5 minute(s), 0 second(s)') == 300
+
+
+def test_facts_cache_reuse(tmp_path):
+    cache = DeviceFactsCache(str(tmp_path / 'facts'))
+    assert cache.get('10.1.2.3', 'version') is None
+    cache.set('10.1.2.3', 'board 0', {1: {'name': 'H901GPHF', 'status': 'Normal'}})
+    assert cache.get('10.1.2.3', 'board 0') is None
+
+    cache.update_version('10.1.2.3', VERSION)
+    cache.set('10.1.2.3', 'board 0', {1: {'name': 'H901GPHF', 'status': 'Normal'}})
+    assert 'uptime' not in cache.get('10.1.2.3', 'version')
+
+    reloaded = DeviceFactsCache(str(tmp_path / 'facts'))
+    assert reloaded.get('10.1.2.3', 'board 0') == {'1': {'name': 'H901GPHF', 'status': 'Normal'}}
+
+
+def test_facts_cache_invalidated_after_reboot(tmp_path):
+    cache = DeviceFactsCache(str(tmp_path / 'facts'))
+    cache.update_version('10.1.2.3', VERSION)
+    cache.set('10.1.2.3', 'board 0', {})
+    cache.update_version('10.1.2.3', VERSION)
+    assert cache.get('10.1.2.3', 'board 0') == {}
+
+    cache.update_version('10.1.2.3', {**VERSION, 'uptime': '0 day(s), 0 hour(s), 5 minute(s), 0 second(s)'})
+    assert cache.get('10.1.2.3', 'board 0') is None
+    cache.set('10.1.2.3', 'board 0', {})
+    cache.update_version('10.1.2.3', {**VERSION, 'patch': 'SPC300',
+                                      'uptime': '0 day(s), 0 hour(s), 5 minute(s), 0 second(s)'})
+    assert cache.get('10.1.2.3', 'board 0') is None
+
+
+def test_facts_cache_max_age(tmp_path):
+    cache = DeviceFactsCache(str(tmp_path / 'facts'), max_age=0.1)
+    cache.update_version('10.1.2.3', VERSION)
+    assert cache.get('10.1.2.3', 'version') is not None
+    time.sleep(0.2)
+    assert cache.get('10.1.2.3', 'version') is None
+
+
+def test_facts_cache_shared_by_jobs(tmp_path):
+    first = DeviceFactsCache(str(tmp_path / 'facts'))
+    second = DeviceFactsCache(str(tmp_path / 'facts'))
+    first.update_version('10.1.2.3', VERSION)
+    second.update_version('10.2.3.4', VERSION)
+    first.set('10.1.2.3', 'board 0', {})
+
+    reader = DeviceFactsCache(str(tmp_path / 'facts'))
+    assert reader.get('10.1.2.3', 'board 0') == {}
+    assert reader.get('10.2.3.4', 'version') is not None
+    assert second.get('10.1.2.3', 'board 0') == {}
+    assert [path.name for path in (tmp_path / 'facts').iterdir() if path.suffix == '.tmp'] == []
+
+
+def test_facts_cache_unreadable_file(tmp_path):
+    cache = DeviceFactsCache(str(tmp_path / 'facts'))
+    (tmp_path / 'facts' / '10.1.2.3.json').write_text('')
+    assert cache.get('10.1.2.3', 'version') is None
+    (tmp_path / 'facts' / '10.1.2.3.json').write_text('{"facts": ')
+    assert cache.get('10.1.2.3', 'version') is None
+    cache.update_version('10.1.2.3', VERSION)
+    assert cache.get('10.1.2.3', 'version') is not None
+    cache.invalidate('10.1.2.3')
+    assert cache.get('10.1.2.3', 'version') is None
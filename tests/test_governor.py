@@ -0,0 +1,104 @@
+import threading
+import time
+from pyhuoi.governor import CommandGovernor
+
+
+def test_for_olt_shared():
+    assert CommandGovernor.for_olt('10.1.2.3') is CommandGovernor.for_olt('10.1.2.3')
+    assert CommandGovernor.for_olt('10.1.2.3') is not CommandGovernor.for_olt('10.2.3.4')
+
+
+def test_is_heavy():
+    governor = CommandGovernor()
+    assert governor.is_heavy('display ont info 0 all')
+    assert governor.is_heavy('display ont info 0 1 2 all')
+    assert governor.is_heavy('display service-port all')
+    assert governor.is_heavy('display service-port port 0/1/0')
+    assert not governor.is_heavy('display service-port port 0/1/0 ont 3')
+    assert not governor.is_heavy('display ont info by-sn 4800000000073357')
+    assert not governor.is_heavy('display version')
+
+
+def test_token_bucket_rate():
+    governor = CommandGovernor(rate=20, burst=2)
+    started_at = time.monotonic()
+    for _ in range(6):
+        with governor.command('display version'):
+            pass
+    # 2 commands from burst, next 4 at 20 per second
+    assert time.monotonic() - started_at >= 0.19
+    metrics = governor.metrics()
+    assert metrics['commands'] == 6
+    assert metrics['waiting'] == 0
+    assert metrics['last_queue_delay'] > 0
+
+
+def test_heavy_commands_limit():
+    governor = CommandGovernor(max_heavy=1)
+    running = []
+    max_running = []
+
+    def heavy_command():
+        with governor.command('display ont info 0 all'):
+            running.append(1)
+            max_running.append(len(running))
+            time.sleep(0.05)
+            running.pop()
+
+    threads = [threading.Thread(target=heavy_command) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(max_running) == 1
+    assert governor.metrics()['heavy_running'] == 0
+
+
+def test_backoff_on_latency():
+    governor = CommandGovernor(rate=100, burst=100, cooldown=0)
+    for _ in range(5):
+        with governor.command('display version'):
+            pass
+    assert governor.metrics()['current_rate'] == 100
+    for _ in range(5):
+        with governor.command('display version'):
+            time.sleep(0.05)
+    assert governor.metrics()['current_rate'] < 100
+
+
+def test_command_kind():
+    assert CommandGovernor.command_kind('display ont info 0 1 all') == 'display ont info'
+    assert CommandGovernor.command_kind('ont add 0 5 sn-auth 4800000000073357') == 'ont add'
+    assert CommandGovernor.command_kind('enable') == 'enable'
+
+
+def test_no_backoff_on_different_command_kinds():
+    governor = CommandGovernor(rate=100, burst=100, cooldown=0)
+    for _ in range(3):
+        with governor.command('enable'):
+            time.sleep(0.002)
+    with governor.command('display ont info by-sn 4800000000073357'):
+        time.sleep(0.03)
+    assert governor.metrics()['current_rate'] == 100
+
+
+def test_no_backoff_on_output_size():
+    governor = CommandGovernor(rate=10, burst=10, cooldown=0)
+    with governor.command('display ont info 0 1 all') as stats:
+        time.sleep(0.01)
+        stats['output_size'] = 1024
+    with governor.command('display ont info 0 2 all') as stats:
+        time.sleep(0.2)
+        stats['output_size'] = 40 * 1024
+    assert governor.metrics()['current_rate'] == 10
+
+
+def test_observed_rate():
+    governor = CommandGovernor(rate_window=1.0)
+    assert governor.metrics()['observed_rate'] == 0
+    for _ in range(5):
+        with governor.command('display version'):
+            pass
+    assert governor.metrics()['observed_rate'] == 5
+    time.sleep(1.1)
+    assert governor.metrics()['observed_rate'] == 0
@@ -432,3 +432,27 @@ def test_get_onu_by_sn_no_onu(olt_name, olt_params):
     onusn = '0800000000073357'
     onu = olt.get_onu_by_sn(onusn)
     assert onu is None
+
+
+def test_onu_delete_bulk_no_onuid():
+    olt = Olt()
+    onus = [Onu(sn='4800000000073357', frame='0', board='0', port='0', onuid=1),
+            Onu(sn='4800000000073358', frame='0', board='0', port='0')]
+    with pytest.raises(TypeError):
+        olt.onu_delete_bulk(onus)
+
+
+@pytest.mark.parametrize('olt_name, olt_params', read_olt_parameters(True).items())
+def test_onu_delete_bulk(olt_name, olt_params):
+    olt = Olt(ip=olt_params['ip'],
+              username=olt_params['username'],
+              password=olt_params['password'],
+              session_log='test_onu_delete_bulk.log')
+    olt.get_connection()
+    onusn = '4800000000073357'
+    onu = olt.get_onu_by_sn(onusn)
+    assert onu is not None
+    report = olt.onu_delete_bulk([onu])
+    assert report == {(int(onu.frame), int(onu.board), int(onu.port), int(onu.onuid)): None}
+    assert olt.get_onu_by_sn(onusn) is None
+    assert len(olt.get_service_ports(onu)) == 0
@@ -0,0 +1,199 @@
+"""Tests of Olt logic run against fake connection, without OLT"""
+from netmiko import ReadTimeout
+from pyhuoi.allocator import IdAllocator
+from pyhuoi.governor import CommandGovernor
+from pyhuoi.olt import Olt, OltConfigMode
+from pyhuoi.onu import Onu, ServicePort
+import pytest
+
+
+class FakeConnection:
+    """Records sent commands, answers them with responses(cmd) - string or exception to raise"""
+
+    def __init__(self, responses=None, prompt='MA5800#'):
+        self.responses = responses or (lambda cmd: '')
+        self.prompt = prompt
+        self.sent = []
+        self.kwargs = []
+
+    def send_command(self, cmd, **kwargs):
+        self.sent.append(cmd)
+        self.kwargs.append(kwargs)
+        response = self.responses(cmd)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def find_prompt(self):
+        return self.prompt
+
+    def disconnect(self):
+        pass
+
+
+def fake_olt(responses=None, prompt='MA5800#') -> Olt:
+    olt = Olt(ip='fake', governor=CommandGovernor(rate=1000, burst=1000))
+    olt.connection = FakeConnection(responses, prompt)
+    olt.config_mode = OltConfigMode.USER
+    return olt
+
+
+SERVICE_PORTS_0_1_0 = '   28 1554 common gpon 0/1 /0  3    1    vlan 301  10   10   up\n' \
+                      '   29  501 common gpon 0/1 /0  3    2    vlan 500  10   10   up\n'
+
+
+def delete_responses(cmd):
+    if cmd == 'display service-port port 0/1/0':
+        return SERVICE_PORTS_0_1_0
+    if cmd == 'display service-port port 0/1/1':
+        return ReadTimeout('display timed out')
+    if cmd.startswith('ont delete'):
+        return 'Number of ONTs that can be deleted: 1, success: 1'
+    return ''
+
+
+def test_onu_delete_bulk():
+    olt = fake_olt(delete_responses)
+    report = olt.onu_delete_bulk([Onu(frame=0, board=1, port=0, onuid=3),
+                                  Onu(frame='0', board='1', port='0', onuid='5')])
+    assert report == {(0, 1, 0, 3): None, (0, 1, 0, 5): None}
+    assert olt.connection.sent == ['enable',
+                                   'display service-port port 0/1/0',
+                                   'config',
+                                   'undo service-port port 0/1/0 ont 3',
+                                   'interface gpon 0/1',
+                                   'ont delete 0 3',
+                                   'ont delete 0 5']
+    undo_kwargs = olt.connection.kwargs[olt.connection.sent.index('undo service-port port 0/1/0 ont 3')]
+    assert undo_kwargs['read_timeout'] >= 60
+
+
+def test_onu_delete_bulk_port_read_timeout():
+    olt = fake_olt(delete_responses, prompt='MA5800#')
+    report = olt.onu_delete_bulk([Onu(frame=0, board=1, port=0, onuid=3),
+                                  Onu(frame=0, board=1, port=1, onuid=4)])
+    assert report[(0, 1, 0, 3)] is None
+    assert 'ReadTimeout' in report[(0, 1, 1, 4)]
+    assert 'ont delete 0 3' in olt.connection.sent
+    assert 'ont delete 1 4' not in olt.connection.sent
+
+
+def test_onu_delete_bulk_stops_after_undo_timeout():
+    def responses(cmd):
+        if cmd == 'undo service-port port 0/1/0 ont 3':
+            return ReadTimeout('undo timed out')
+        return delete_responses(cmd).replace('  3    2', '  5    2')
+
+    olt = fake_olt(responses, prompt='MA5800(config)#')
+    report = olt.onu_delete_bulk([Onu(frame=0, board=1, port=0, onuid=3),
+                                  Onu(frame=0, board=1, port=0, onuid=5)])
+    assert 'undo timed out' in report[(0, 1, 0, 3)]
+    assert report[(0, 1, 0, 5)].startswith('Not processed')
+    assert 'undo service-port port 0/1/0 ont 5' not in olt.connection.sent
+    assert not any(cmd.startswith('ont delete') for cmd in olt.connection.sent)
+    assert olt.get_config_mode() == OltConfigMode.CONFIG
+
+
+ONT_ADD_SUCCESS = 'Number of ONTs that can be added: 1, success: 1\nPortID :0, ONTID :{onuid}'
+ONU_LIST_0_1_0 = '  0/ 1/0    0  4800000000073300  active  online  normal  match  no\n'
+
+
+def allocated_onu() -> Onu:
+    return Onu(sn='4800000000073357', frame=0, board=1, port=0,
+               lineprofile_name='line', srvprofile_name='srv', desc='test_PyHuOi')
+
+
+def test_onu_add_allocated_resync_on_conflict():
+    ont_adds = []
+
+    def responses(cmd):
+        if cmd.startswith('ont add'):
+            ont_adds.append(cmd)
+            if len(ont_adds) == 1:
+                return 'Failure: The ONT ID has already existed'
+            return ONT_ADD_SUCCESS.format(onuid=cmd.split()[3])
+        if cmd == 'display ont info 0 all':
+            return ONU_LIST_0_1_0
+        return ''
+
+    olt = fake_olt(responses)
+    allocator = IdAllocator()
+    allocator.load({(0, 1, 0): set()}, set())
+    onu = allocated_onu()
+    assert olt.onu_add_allocated(onu, allocator) is None
+    assert [cmd.split()[3] for cmd in ont_adds] == ['0', '1']
+    assert [cmd for cmd in olt.connection.sent if cmd.startswith(('ont add', 'display'))] == \
+           [ont_adds[0], 'display ont info 0 all', ont_adds[1]]
+    assert onu.onuid == 1
+    assert allocator._allocated_onuids == {(0, 1, 0): set()}
+    assert allocator.allocate_onuid(0, 1, 0) == 2
+
+
+def test_onu_add_allocated_other_failure():
+    olt = fake_olt(lambda cmd: 'Failure: SN already exists' if cmd.startswith('ont add') else '')
+    allocator = IdAllocator()
+    allocator.load({(0, 1, 0): set()}, set())
+    onu = allocated_onu()
+    assert olt.onu_add_allocated(onu, allocator) == 'Failure: SN already exists'
+    assert len([cmd for cmd in olt.connection.sent if cmd.startswith('ont add')]) == 1
+    assert not any(cmd.startswith('display') for cmd in olt.connection.sent)
+    assert onu.onuid is None
+    assert allocator.allocate_onuid(0, 1, 0) == 0
+
+
+def test_onu_add_allocated_exception_releases_id():
+    allocator = IdAllocator()
+    allocator.load({(0, 1, 0): set()}, set())
+    onu = allocated_onu()
+    onu.lineprofile_name = None
+    with pytest.raises(TypeError):
+        fake_olt().onu_add_allocated(onu, allocator)
+    assert allocator._allocated_onuids == {}
+
+    olt = fake_olt(lambda cmd: RuntimeError('connection lost') if cmd.startswith('ont add') else '')
+    onu = allocated_onu()
+    with pytest.raises(RuntimeError):
+        olt.onu_add_allocated(onu, allocator)
+    assert onu.onuid is None
+    assert allocator._allocated_onuids == {(0, 1, 0): set()}
+    assert allocator.allocate_onuid(0, 1, 0) == 0
+
+
+def test_service_port_add_allocated_resync_on_conflict():
+    service_port_adds = []
+
+    def responses(cmd):
+        if cmd.startswith('service-port'):
+            service_port_adds.append(cmd)
+            if len(service_port_adds) == 1:
+                return 'Failure: The service virtual port has existed already'
+            return ''
+        if cmd == 'display service-port all':
+            return SERVICE_PORTS_0_1_0.replace('   28', '    0')
+        return ''
+
+    olt = fake_olt(responses)
+    allocator = IdAllocator()
+    allocator.load({}, set())
+    onu = Onu(frame=0, board=1, port=0, onuid=3)
+    service_port = ServicePort(vlan=1554, gemport=1)
+    assert olt.service_port_add_allocated(onu, service_port, allocator) is None
+    assert [cmd.split()[1] for cmd in service_port_adds] == ['0', '1']
+    assert 'display service-port all' in olt.connection.sent
+    assert service_port.id == 1
+    assert allocator._allocated_service_port_ids == set()
+    assert allocator.allocate_service_port_id() == 2
+
+
+def test_service_port_add_allocated_exception_releases_id():
+    allocator = IdAllocator()
+    allocator.load({}, set())
+    olt = fake_olt(lambda cmd: RuntimeError('connection lost') if cmd.startswith('service-port') else '')
+    service_port = ServicePort(vlan=1554, gemport=1)
+    with pytest.raises(RuntimeError):
+        olt.service_port_add_allocated(Onu(frame=0, board=1, port=0, onuid=3), service_port, allocator)
+    assert service_port.id is None
+    assert allocator._allocated_service_port_ids == set()
+    with pytest.raises(TypeError):
+        olt.service_port_add_allocated(Onu(frame=0, board=1, port=0, onuid=3), ServicePort(vlan=1554), allocator)
+    assert allocator._used_service_port_ids == set()